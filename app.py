@@ -24,12 +24,24 @@ import os
 # Enhanced Python Terminal
 import os
 import sys
+import bisect
+import collections
+import fcntl
+import functools
+import heapq
 import shutil
 import psutil
+import queue
 import readline
 import shlex
 import re
+import selectors
+import signal
+import socket
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
 from datetime import datetime
 
 HISTORY_FILE = os.path.expanduser("~/.pyterminal_history")
@@ -41,6 +53,117 @@ def load_history():
     if os.path.exists(HISTORY_FILE):
         readline.read_history_file(HISTORY_FILE)
 
+# ---------- Process spawning ----------
+def _wait_exitcode(pid):
+    # Like os.system, keep waiting if ^C arrives: the child got it too.
+    while True:
+        try:
+            _, status = os.waitpid(pid, 0)
+            return os.waitstatus_to_exitcode(status)
+        except KeyboardInterrupt:
+            continue
+
+def _read_pipes(*fds):
+    """Drain several pipes concurrently; returns one bytes object per fd."""
+    chunks = {fd: [] for fd in fds}
+    with selectors.DefaultSelector() as sel:
+        for fd in fds:
+            sel.register(fd, selectors.EVENT_READ)
+        while sel.get_map():
+            for key, _ in sel.select():
+                data = os.read(key.fd, 65536)
+                if data:
+                    chunks[key.fd].append(data)
+                else:
+                    sel.unregister(key.fd)
+                    os.close(key.fd)
+    return tuple(b"".join(chunks[fd]) for fd in fds)
+
+def spawn(argv, capture=False, env=None):
+    """
+    Run argv (no shell) and wait for it. Uses os.posix_spawnp, which glibc
+    implements with vfork, so launch cost does not grow with our heap the
+    way fork()-based os.system/subprocess do.
+    Returns (returncode, stdout, stderr); the output is only collected
+    when capture=True, otherwise the child inherits our stdio.
+    """
+    if env is None:
+        env = os.environ
+    if not hasattr(os, 'posix_spawnp'):
+        if capture:
+            proc = subprocess.run(argv, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            return proc.returncode, proc.stdout, proc.stderr
+        return subprocess.call(argv, env=env), b"", b""
+    # the spawn server ignores SIGINT; give children the default back
+    sigdef = (signal.SIGINT,)
+    if not capture:
+        pid = os.posix_spawnp(argv[0], argv, env, setsigdef=sigdef)
+        return _wait_exitcode(pid), b"", b""
+    # pipe fds are close-on-exec; dup2 onto 1/2 clears the flag for the child
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    try:
+        pid = os.posix_spawnp(argv[0], argv, env, setsigdef=sigdef, file_actions=[
+            (os.POSIX_SPAWN_DUP2, out_w, 1),
+            (os.POSIX_SPAWN_DUP2, err_w, 2),
+        ])
+    except Exception:
+        os.close(out_r)
+        os.close(err_r)
+        raise
+    finally:
+        os.close(out_w)
+        os.close(err_w)
+    out, err = _read_pipes(out_r, err_r)
+    return _wait_exitcode(pid), out, err
+
+def _spawn_server(conn):
+    # Runs in the forked helper: (argv, cwd, env) in, spawn() result or exception out.
+    while True:
+        try:
+            argv, cwd, env = conn.recv()
+        except (EOFError, OSError):
+            os._exit(0)
+        try:
+            os.chdir(cwd)
+            reply = spawn(argv, capture=True, env=env)
+        except Exception as e:
+            reply = e
+        try:
+            conn.send(reply)
+        except OSError:
+            os._exit(0)
+
+def start_spawn_server():
+    """
+    Fork a helper process that launches external commands on our behalf,
+    so the REPL itself (with its growing heap) never forks again.
+    Returns (Connection to the helper, helper pid), or (None, None) if
+    forking is unavailable.
+    """
+    if not hasattr(os, 'fork'):
+        return None, None
+    ours, theirs = socket.socketpair()
+    try:
+        pid = os.fork()
+    except OSError:
+        ours.close()
+        theirs.close()
+        return None, None
+    if pid == 0:
+        try:
+            ours.close()
+            fd = theirs.detach()
+            os.closerange(3, fd)
+            os.closerange(fd + 1, os.sysconf('SC_OPEN_MAX'))
+            # ^C belongs to the foreground command, not the helper
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            _spawn_server(Connection(fd))
+        finally:
+            os._exit(0)
+    theirs.close()
+    return Connection(ours.detach()), pid
+
 def list_dir(args):
     path = args[0] if args else '.'
     try:
@@ -149,7 +272,9 @@ def parse_and_execute(cmdline):
     else:
         # Try to execute as system command
         try:
-            os.system(cmdline)
+            spawn(shlex.split(cmdline))
+        except FileNotFoundError:
+            print(f"{cmd}: command not found")
         except Exception as e:
             print(f"Error: {e}")
 
@@ -172,6 +297,22 @@ if __name__ == "__main__":
     main()
 HISTORY_FILE = os.path.expanduser("~/.pyterm_history")
 MAX_HISTORY = 2000
+# libedit (macOS) has its own history file format: a _HiStOrY_V2_ header and vis-escaped lines
+_LIBEDIT = "libedit" in (readline.__doc__ or "")
+
+# Natural-language patterns, compiled once rather than per REPL line
+_NL_VERB_RE = re.compile(r'\b(?:create|make|move|delete|remove|show|list|display|open|read|write|copy|rename)\b', re.I)
+_NL_MKDIR_RE = re.compile(r'(create|make|new)\s+(?:a\s+)?(?:folder|directory)\s+(?:called\s+)?["\']?([^\s"\']+)["\']?')
+
+# Can we address files relative to an open directory fd?
+_DIR_FD = (hasattr(os, 'O_DIRECTORY') and
+           {os.open, os.stat, os.utime} <= os.supports_dir_fd)
+
+# Short-flag letter -> bit, for parse_flags
+_LS_LONG, _LS_ALL = 1, 2
+_LS_FLAGS = {'l': _LS_LONG, 'a': _LS_ALL}
+_RM_RECURSIVE, _RM_FORCE = 1, 2
+_RM_FLAGS = {'r': _RM_RECURSIVE, 'f': _RM_FORCE}
 
 # ---------- Helper utilities ----------
 def safe_print(s=""):
@@ -183,33 +324,169 @@ def safe_print(s=""):
             s = str(s)
     print(s)
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
 def human_size(n):
     """Human-friendly file size"""
-    for unit in ['B','KB','MB','GB','TB']:
-        if abs(n) < 1024.0:
-            return f"{n:3.1f}{unit}"
-        n /= 1024.0
-    return f"{n:.1f}PB"
+    # each unit is 2**10 of the previous one, so bit_length picks it without a loop
+    idx = min(max(0, (int(abs(n)).bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+    return f"{n / (1 << (idx * 10)):3.1f}{SIZE_UNITS[idx]}"
+
+def tail_lines(fh, n, block=4096):
+    """Last n lines of a binary file, read backwards block by block."""
+    if n <= 0:
+        return []
+    pos = os.fstat(fh.fileno()).st_size
+    if not pos or not fh.seekable():
+        # size 0 may be a pseudo-file (/proc), pipes can't seek: read forward instead
+        return [line.rstrip(b"\r\n") for line in collections.deque(fh, maxlen=n)]
+    chunks = []
+    newlines = 0
+    # n+1 newlines guarantee the first of the n lines is complete
+    while pos > 0 and newlines <= n:
+        step = min(block, pos)
+        pos -= step
+        fh.seek(pos)
+        chunk = fh.read(step)
+        newlines += chunk.count(b"\n")
+        chunks.append(chunk)
+    return b"".join(reversed(chunks)).splitlines()[-n:]
+
+def copy_to_stdout(fh):
+    """Copy an open binary file to stdout without reading it into memory."""
+    sys.stdout.flush()
+    offset = 0
+    try:
+        out_fd = sys.stdout.fileno()
+        size = os.fstat(fh.fileno()).st_size
+        # kernel-side copy; size 0 may be a pseudo-file, so let the fallback read it
+        while offset < size:
+            sent = os.sendfile(out_fd, fh.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+        if size:
+            return
+    except (AttributeError, OSError, ValueError):
+        # no sendfile, stdout is not a real fd, or the platform refuses this pair
+        pass
+    fh.seek(offset)
+    shutil.copyfileobj(fh, sys.stdout.buffer, 1 << 20)
+    sys.stdout.buffer.flush()
+
+def split_args(line):
+    """shlex.split, skipping the pure-Python lexer when there is nothing to unquote."""
+    if '"' in line or "'" in line or '\\' in line:
+        return shlex.split(line)
+    return line.split()
+
+def parse_flags(argv, table):
+    """One pass over argv: OR together the bits of known flag letters, collect operands."""
+    mask = 0
+    operands = []
+    for a in argv:
+        if a.startswith('-'):
+            for c in a[1:]:
+                mask |= table.get(c, 0)
+        else:
+            operands.append(a)
+    return mask, operands
+
+def parse_nflag(argv, default=10):
+    """Split head/tail argv into (line count, files); accepts -nN and -n N."""
+    if not argv or not argv[0].startswith('-'):
+        return default, argv
+    flag = argv[0]
+    if flag == '-n' and len(argv) > 1 and argv[1].isdecimal():
+        return int(argv[1]), argv[2:]
+    if flag[:2] == '-n' and flag[2:].isdecimal():
+        return int(flag[2:]), argv[1:]
+    # unknown option: skip it, as before
+    return default, argv[1:]
+
+def stat_at(ref, dir_fd, path):
+    """os.stat(ref, dir_fd=dir_fd), with errors naming the full path."""
+    try:
+        return os.stat(ref, dir_fd=dir_fd)
+    except OSError as e:
+        e.filename = path
+        raise
+
+def prefix_matches(names, prefix):
+    """Entries of a sorted list that start with prefix (bisect, then walk)."""
+    i = bisect.bisect_left(names, prefix)
+    out = []
+    while i < len(names) and names[i].startswith(prefix):
+        out.append(names[i])
+        i += 1
+    return out
+
+@functools.lru_cache(maxsize=128)
+def scandir_sorted(path, mtime_ns):
+    """(sorted names, directory names) of path; mtime_ns keys the cache so a changed dir is re-read."""
+    # scandir: is_dir() comes from the dirent, no stat per entry
+    with os.scandir(path) as it:
+        entries = [(e.name, e.is_dir()) for e in it]
+    return tuple(sorted(name for name, _ in entries)), frozenset(name for name, is_dir in entries if is_dir)
 
 def read_history():
     try:
         readline.read_history_file(HISTORY_FILE)
-    except FileNotFoundError:
+    except OSError:
+        # missing, or in a format this readline rejects: start with empty history
         pass
 
 def write_history():
     try:
-        readline.set_history_length(MAX_HISTORY)
         readline.write_history_file(HISTORY_FILE)
-    except Exception:
+    except OSError:
+        pass
+
+def cap_history():
+    # set_history_length only limits what write_history_file saves; cap the in-memory list here
+    while readline.get_current_history_length() > MAX_HISTORY:
+        readline.remove_history_item(0)
+
+def trim_history():
+    # the history writer only appends; cut the file back to the newest MAX_HISTORY lines.
+    # In place and under the writers' flock, so other sessions appending to it lose nothing.
+    try:
+        with open(HISTORY_FILE, 'r+b') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            lines = tail_lines(fh, MAX_HISTORY)
+            data = b"\n".join(lines) + b"\n" if lines else b""
+            if len(data) >= os.fstat(fh.fileno()).st_size:
+                return
+            fh.seek(0)
+            fh.write(data)
+            fh.truncate()
+    except OSError:
         pass
 
 # ---------- Terminal core ----------
 class Terminal:
+    # fixed attribute set: no per-instance __dict__
+    __slots__ = ('cwd', '_cwd_sep', '_home', 'builtins', '_cmd_names',
+                 '_spawner', '_spawner_pid', '_hist_q', '_hist_thread', '_last_hist_line', '_pool')
+
     def __init__(self):
-        self.cwd = os.path.abspath(os.getcwd())
+        self._home = os.path.expanduser('~')
+        self._set_cwd(os.path.abspath(os.getcwd()))
         self.builtins = self._discover_builtins()
+        # sorted names for completion/help; dispatch stays a dict lookup
+        self._cmd_names = tuple(sorted(self.builtins))
+        self._spawner, self._spawner_pid = start_spawn_server()
         self.setup_readline()
+        if _LIBEDIT:
+            # raw appended lines would make libedit reject the file; write it whole on exit
+            self._hist_q = self._hist_thread = None
+        else:
+            # started after the fork above so the spawn server stays single-threaded
+            self._hist_q = queue.Queue()
+            self._hist_thread = threading.Thread(target=self._hist_writer, name="history-writer", daemon=True)
+            self._hist_thread.start()
+        # I/O-bound per-file syscalls release the GIL; workers start on first use
+        self._pool = ThreadPoolExecutor(max_workers=8)
 
     def _discover_builtins(self):
         # map command name to method
@@ -220,28 +497,62 @@ class Terminal:
                 cmds[cmd] = getattr(self, name)
         return cmds
 
+    # ---- Paths ----
+    def _set_cwd(self, path):
+        self.cwd = path
+        self._cwd_sep = path if path.endswith(os.sep) else path + os.sep
+
+    def _resolve(self, p):
+        """expanduser + make absolute against self.cwd, with $HOME looked up once."""
+        if p[:1] == '~':
+            # ~user still goes through expanduser (password database)
+            p = self._home + p[1:] if p[1:2] in ('', os.sep) else os.path.expanduser(p)
+        return p if p.startswith(os.sep) else self._cwd_sep + p
+
+    def _open_parents(self, targets):
+        """
+        Open each distinct parent directory of targets once, so per-file
+        syscalls resolve a single name against a dir fd instead of walking
+        the whole path. Returns (fds, refs): refs[i] is (name, dir_fd) for
+        targets[i], or (path, None) when that is not possible. The caller
+        closes fds.
+        """
+        by_parent = {}
+        refs = []
+        for t in targets:
+            parent, name = os.path.split(t)
+            if _DIR_FD and name:
+                if parent not in by_parent:
+                    try:
+                        by_parent[parent] = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+                    except OSError:
+                        by_parent[parent] = None
+                if by_parent[parent] is not None:
+                    refs.append((name, by_parent[parent]))
+                    continue
+            refs.append((t, None))
+        return [fd for fd in by_parent.values() if fd is not None], refs
+
     # ---- Readline: history + completion ----
     def setup_readline(self):
         # history
         readline.parse_and_bind('tab: complete')
         read_history()
+        cap_history()
+        n = readline.get_current_history_length()
+        self._last_hist_line = readline.get_history_item(n) if n else None
 
         # completion function
         def completer(text, state):
             buffer = readline.get_line_buffer()
-            line = shlex.split(buffer) if buffer.strip() else []
-            # if first token -> complete command names and filesystem
-            if len(line) == 0 or (buffer.endswith(" ") and len(line) >= 1):
+            line = split_args(buffer)
+            if line and buffer == line[0]:
+                # typing the first token: complete commands + paths
+                offerings = prefix_matches(self._cmd_names, text)
+                offerings += [p for p in self._complete_path(text) if p.startswith(text)]
+            else:
                 # completing an argument: offer filesystem paths
                 offerings = self._complete_path(text)
-            else:
-                # completing first token or partial token
-                first_token = line[0]
-                if buffer.startswith(first_token) and buffer.strip() == first_token:
-                    # complete commands + paths
-                    offerings = [c for c in list(self.builtins.keys()) + self._complete_path(text) if c.startswith(text)]
-                else:
-                    offerings = self._complete_path(text)
             try:
                 return offerings[state]
             except Exception:
@@ -257,24 +568,67 @@ class Terminal:
         dirname = os.path.dirname(text_exp) or '.'
         basename = os.path.basename(text_exp)
         try:
-            entries = os.listdir(dirname)
+            absdir = os.path.abspath(dirname)
+            names, dirs = scandir_sorted(absdir, os.stat(absdir).st_mtime_ns)
         except Exception:
-            entries = []
-        results = [os.path.join(dirname, e) for e in entries if e.startswith(basename)]
+            names, dirs = [], frozenset()
         # present with ~ if originally had ~
         out = []
-        for r in results:
-            display = r
-            if text.startswith('~'):
-                home = os.path.expanduser('~')
-                if r.startswith(home):
-                    display = '~' + r[len(home):]
-            if os.path.isdir(r):
+        home = self._home if text.startswith('~') else None
+        for name in prefix_matches(names, basename):
+            display = os.path.join(dirname, name)
+            if home and display.startswith(home):
+                display = '~' + display[len(home):]
+            if name in dirs:
                 display += os.sep
             out.append(display)
         # If no real filesystem matches, also return empty list
         return out
 
+    # ---- History persistence ----
+    def _hist_writer(self):
+        """Append queued lines to HISTORY_FILE off the REPL thread; None stops it."""
+        try:
+            fh = open(HISTORY_FILE, 'a', encoding='utf-8')
+        except OSError:
+            fh = None
+        while True:
+            item = self._hist_q.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                try:
+                    # coalesce bursts into a single write
+                    item = self._hist_q.get(timeout=1)
+                except queue.Empty:
+                    break
+            if fh is not None:
+                try:
+                    if batch:
+                        # trim_history rewrites the file under this lock
+                        fcntl.flock(fh, fcntl.LOCK_EX)
+                        try:
+                            fh.write("\n".join(batch) + "\n")
+                            fh.flush()
+                        finally:
+                            fcntl.flock(fh, fcntl.LOCK_UN)
+                    if item is None:
+                        os.fsync(fh.fileno())
+                except OSError:
+                    pass
+            if item is None:
+                if fh is not None:
+                    fh.close()
+                    trim_history()
+                return
+
+    def _stop_history_writer(self):
+        if self._hist_q is None:
+            write_history()
+            return
+        self._hist_q.put(None)
+        self._hist_thread.join(timeout=2)
+
     # ---- REPL Loop ----
     def repl(self):
         try:
@@ -291,8 +645,13 @@ class Terminal:
                 line = line.strip()
                 if not line:
                     continue
-                # Save to history
-                readline.add_history(line)
+                # Save to history (skipping immediate repeats); the writer thread persists it
+                if line != self._last_hist_line:
+                    readline.add_history(line)
+                    cap_history()
+                    if self._hist_q is not None:
+                        self._hist_q.put(line)
+                    self._last_hist_line = line
                 # Natural-language detection: if sentence-like, try interpret
                 if self._is_natural_language(line):
                     interpreted = self.nl_to_cmd(line)
@@ -301,17 +660,17 @@ class Terminal:
                         line = interpreted
                 self.execute_line(line)
         finally:
-            write_history()
+            self._stop_history_writer()
 
     def _is_natural_language(self, t):
         # Very simple heuristic: contains spaces and verbs/keywords like "create", "move", "delete", "show"
-        return bool(re.search(r'\b(create|make|move|delete|remove|show|list|display|open|read|write|copy|rename)\b', t, re.I))
+        return _NL_VERB_RE.search(t) is not None
 
     # ---- Command execution ----
     def execute_line(self, line):
         # parse command into tokens, but support quotes
         try:
-            tokens = shlex.split(line)
+            tokens = split_args(line)
         except ValueError as e:
             safe_print(f"parse error: {e}")
             return
@@ -320,9 +679,10 @@ class Terminal:
         cmd = tokens[0]
         args = tokens[1:]
         # built-in?
-        if cmd in self.builtins:
+        func = self.builtins.get(cmd)
+        if func is not None:
             try:
-                return self.builtins[cmd](args)
+                return func(args)
             except Exception as e:
                 safe_print(f"error executing builtin {cmd}: {e}")
                 return
@@ -332,17 +692,55 @@ class Terminal:
         # fallback: execute external command
         return self.run_external(cmd, args)
 
+    def _spawn_remote(self, full_cmd):
+        # Hand the command to the spawn server; if it has gone away, spawn locally.
+        # Like os.system, ignore ^C for the whole exchange: an interrupted recv()
+        # would drop a partly read reply and desync the socket. The foreground
+        # child still receives the ^C and the server reports its exit.
+        previous = signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            try:
+                self._spawner.send((full_cmd, self.cwd, dict(os.environ)))
+            except OSError:
+                # never reached the server: safe to run it here instead
+                self._drop_spawner()
+                return spawn(full_cmd, capture=True)
+            try:
+                reply = self._spawner.recv()
+            except (EOFError, OSError):
+                # the server may already have run it; running it again could repeat side effects
+                self._drop_spawner()
+                raise RuntimeError("spawn server exited before reporting the result") from None
+        finally:
+            signal.signal(signal.SIGINT, previous)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    def _drop_spawner(self):
+        # the helper exits once its end of the socket is closed; reap it
+        conn, pid = self._spawner, self._spawner_pid
+        self._spawner = self._spawner_pid = None
+        conn.close()
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
     def run_external(self, cmd, args):
         """Runs external system command and streams output."""
         full_cmd = [cmd] + args
         try:
-            proc = subprocess.Popen(full_cmd, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            out, err = proc.communicate()
+            if self._spawner is not None:
+                returncode, out, err = self._spawn_remote(full_cmd)
+            else:
+                # self.cwd tracks the process cwd (do_cd chdirs), so the child inherits it
+                returncode, out, err = spawn(full_cmd, capture=True)
             if out:
                 safe_print(out)
             if err:
                 safe_print(err)
-            return proc.returncode
+            return returncode
         except FileNotFoundError:
             safe_print(f"{cmd}: command not found")
             return 127
@@ -355,14 +753,11 @@ class Terminal:
         safe_print(self.cwd)
 
     def do_cd(self, argv):
-        target = argv[0] if argv else os.path.expanduser('~')
-        target = os.path.expanduser(target)
-        if not os.path.isabs(target):
-            target = os.path.join(self.cwd, target)
+        target = self._resolve(argv[0] if argv else '~')
         try:
             target = os.path.abspath(target)
             os.chdir(target)
-            self.cwd = target
+            self._set_cwd(target)
         except FileNotFoundError:
             safe_print(f"cd: no such file or directory: {argv[0] if argv else '~'}")
         except NotADirectoryError:
@@ -373,38 +768,27 @@ class Terminal:
             safe_print(f"cd: {e}")
 
     def do_ls(self, argv):
-        path = argv[0] if argv else "."
-        long = False
-        show_all = False
-        # simple flags parsing
-        flags = [a for a in argv if a.startswith('-')]
-        for f in flags:
-            if 'l' in f:
-                long = True
-            if 'a' in f:
-                show_all = True
-        if argv and not argv[0].startswith('-'):
-            path = argv[0]
-        path = os.path.expanduser(path)
-        if not os.path.isabs(path):
-            path = os.path.join(self.cwd, path)
+        mask, operands = parse_flags(argv, _LS_FLAGS)
+        long = bool(mask & _LS_LONG)
+        show_all = bool(mask & _LS_ALL)
+        path = operands[0] if operands else "."
+        path = self._resolve(path)
         try:
             if os.path.isdir(path):
-                entries = os.listdir(path)
-                if not show_all:
-                    entries = [e for e in entries if not e.startswith('.')]
-                entries.sort()
+                with os.scandir(path) as it:
+                    entries = [e for e in it if show_all or not e.name.startswith('.')]
+                entries.sort(key=lambda e: e.name)
                 if long:
                     for e in entries:
-                        full = os.path.join(path, e)
-                        stat = os.stat(full)
+                        # DirEntry.stat caches and needs no path join
+                        stat = e.stat(follow_symlinks=False)
                         mtime = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
                         perms = oct(stat.st_mode)[-3:]
                         size = human_size(stat.st_size)
-                        safe_print(f"{perms}\t{size:>7}\t{mtime}\t{e}")
+                        safe_print(f"{perms}\t{size:>7}\t{mtime}\t{e.name}")
                 else:
                     # simple column-ish
-                    safe_print("  ".join(entries))
+                    safe_print("  ".join(e.name for e in entries))
             else:
                 # path is file: print file name
                 safe_print(os.path.basename(path))
@@ -420,9 +804,7 @@ class Terminal:
             safe_print("mkdir: missing operand")
             return
         for d in argv:
-            target = os.path.expanduser(d)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(d)
             try:
                 os.makedirs(target, exist_ok=False)
             except FileExistsError:
@@ -437,9 +819,7 @@ class Terminal:
             safe_print("rmdir: missing operand")
             return
         for d in argv:
-            target = os.path.expanduser(d)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(d)
             try:
                 os.rmdir(target)
             except FileNotFoundError:
@@ -453,29 +833,20 @@ class Terminal:
         if not argv:
             safe_print("rm: missing operand")
             return
-        recursive = False
-        force = False
-        targets = []
-        for a in argv:
-            if a.startswith('-'):
-                if 'r' in a:
-                    recursive = True
-                if 'f' in a:
-                    force = True
-            else:
-                targets.append(a)
+        mask, targets = parse_flags(argv, _RM_FLAGS)
+        recursive = bool(mask & _RM_RECURSIVE)
+        force = bool(mask & _RM_FORCE)
         for t in targets:
-            target = os.path.expanduser(t)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(t)
             if os.path.isdir(target) and not os.path.islink(target):
                 if not recursive:
                     safe_print(f"rm: cannot remove '{t}': Is a directory (use -r)")
                     continue
                 # recursive remove
                 try:
-                    # careful: use shutil.rmtree
-                    import shutil
+                    # shutil.rmtree already walks with scandir and deletes
+                    # relative to open dir fds (os.unlink/rmdir with dir_fd)
+                    # where supported; see shutil.rmtree.avoids_symlink_attacks
                     shutil.rmtree(target)
                 except Exception as e:
                     safe_print(f"rm: failed to remove directory '{t}': {e}")
@@ -494,29 +865,32 @@ class Terminal:
         if not argv:
             safe_print("touch: missing file operand")
             return
-        for f in argv:
-            target = os.path.expanduser(f)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
-            try:
-                # update timestamp or create file
-                with open(target, 'a'):
-                    os.utime(target, None)
-            except Exception as e:
-                safe_print(f"touch: {e}")
+        targets = [self._resolve(f) for f in argv]
+        fds, refs = self._open_parents(targets)
+        try:
+            for target, (ref, dir_fd) in zip(targets, refs):
+                try:
+                    # update timestamp or create file
+                    os.close(os.open(ref, os.O_WRONLY | os.O_CREAT, 0o666, dir_fd=dir_fd))
+                    os.utime(ref, None, dir_fd=dir_fd)
+                except OSError as e:
+                    e.filename = target
+                    safe_print(f"touch: {e}")
+                except Exception as e:
+                    safe_print(f"touch: {e}")
+        finally:
+            for fd in fds:
+                os.close(fd)
 
     def do_cat(self, argv):
         if not argv:
             safe_print("cat: missing file operand")
             return
         for f in argv:
-            target = os.path.expanduser(f)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(f)
             try:
                 with open(target, 'rb') as fh:
-                    data = fh.read()
-                    safe_print(data)
+                    copy_to_stdout(fh)
             except FileNotFoundError:
                 safe_print(f"cat: {f}: No such file or directory")
             except IsADirectoryError:
@@ -527,26 +901,12 @@ class Terminal:
                 safe_print(f"cat: {e}")
 
     def do_head(self, argv):
-        lines = 10
-        files = []
-        if argv and argv[0].startswith('-'):
-            # e.g. -n 5
-            # very simple parsing
-            m = re.match(r'-n(\d+)', argv[0])
-            if m:
-                lines = int(m.group(1))
-                files = argv[1:]
-            else:
-                files = argv[1:]
-        else:
-            files = argv
+        lines, files = parse_nflag(argv)
         if not files:
             safe_print("head: missing file operand")
             return
         for f in files:
-            target = os.path.expanduser(f)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(f)
             try:
                 with open(target, 'r', encoding='utf-8', errors='replace') as fh:
                     for i, line in enumerate(fh):
@@ -557,29 +917,16 @@ class Terminal:
                 safe_print(f"head: {e}")
 
     def do_tail(self, argv):
-        lines = 10
-        files = []
-        if argv and argv[0].startswith('-'):
-            m = re.match(r'-n(\d+)', argv[0])
-            if m:
-                lines = int(m.group(1))
-                files = argv[1:]
-            else:
-                files = argv[1:]
-        else:
-            files = argv
+        lines, files = parse_nflag(argv)
         if not files:
             safe_print("tail: missing file operand")
             return
         for f in files:
-            target = os.path.expanduser(f)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+            target = self._resolve(f)
             try:
-                with open(target, 'r', encoding='utf-8', errors='replace') as fh:
-                    data = fh.readlines()
-                    for line in data[-lines:]:
-                        safe_print(line.rstrip('\n'))
+                with open(target, 'rb') as fh:
+                    for line in tail_lines(fh, lines):
+                        safe_print(line.decode('utf-8', errors='replace'))
             except Exception as e:
                 safe_print(f"tail: {e}")
 
@@ -589,9 +936,7 @@ class Terminal:
             return
         srcs = argv[:-1]
         dest = argv[-1]
-        dest = os.path.expanduser(dest)
-        if not os.path.isabs(dest):
-            dest = os.path.join(self.cwd, dest)
+        dest = self._resolve(dest)
         try:
             if len(srcs) > 1:
                 # dest must be directory
@@ -599,9 +944,7 @@ class Terminal:
                     safe_print("mv: when moving multiple files, destination must be a directory")
                     return
             for s in srcs:
-                src = os.path.expanduser(s)
-                if not os.path.isabs(src):
-                    src = os.path.join(self.cwd, src)
+                src = self._resolve(s)
                 base = os.path.basename(src)
                 target = dest if len(srcs) == 1 and not os.path.isdir(dest) else os.path.join(dest, base)
                 os.rename(src, target)
@@ -612,21 +955,16 @@ class Terminal:
         if len(argv) < 2:
             safe_print("cp: missing file operand")
             return
-        import shutil
         srcs = argv[:-1]
         dest = argv[-1]
-        dest = os.path.expanduser(dest)
-        if not os.path.isabs(dest):
-            dest = os.path.join(self.cwd, dest)
+        dest = self._resolve(dest)
         try:
             if len(srcs) > 1:
                 if not os.path.isdir(dest):
                     safe_print("cp: when copying multiple files, destination must be a directory")
                     return
             for s in srcs:
-                src = os.path.expanduser(s)
-                if not os.path.isabs(src):
-                    src = os.path.join(self.cwd, src)
+                src = self._resolve(s)
                 if os.path.isdir(src):
                     shutil.copytree(src, os.path.join(dest, os.path.basename(src)))
                 else:
@@ -639,12 +977,27 @@ class Terminal:
         if not argv:
             safe_print("stat: missing operand")
             return
-        for f in argv:
-            target = os.path.expanduser(f)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+        targets = [self._resolve(f) for f in argv]
+        fds, refs = self._open_parents(targets)
+        try:
+            if len(targets) == 1:
+                # one stat is cheaper inline than a round trip through the pool
+                (ref, dir_fd), = refs
+                results = [lambda: stat_at(ref, dir_fd, targets[0])]
+            else:
+                # stat concurrently, report in argument order
+                results = [self._pool.submit(stat_at, ref, dir_fd, t).result
+                           for t, (ref, dir_fd) in zip(targets, refs)]
+            self._print_stats(targets, results)
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def _print_stats(self, targets, results):
+        # results: one callable per target returning its stat_result (or raising)
+        for target, result in zip(targets, results):
             try:
-                st = os.stat(target)
+                st = result()
                 safe_print(f"  File: {target}")
                 safe_print(f"  Size: {st.st_size}\tBlocks: {getattr(st, 'st_blocks', 'N/A')}\tIO Block: {getattr(st, 'st_blksize', 'N/A')}")
                 safe_print(f"Device: {getattr(st, 'st_dev', 'N/A')}\tInode: {getattr(st, 'st_ino', 'N/A')}\tLinks: {st.st_nlink}")
@@ -679,8 +1032,10 @@ class Terminal:
         safe_print(f"Memory: {mem.percent}% ({human_size(mem.used)} / {human_size(mem.total)})")
         safe_print(f"Swap  : {swap.percent}% ({human_size(swap.used)} / {human_size(swap.total)})")
         safe_print("\nTop processes by CPU:")
-        procs = sorted(psutil.process_iter(['pid','name','cpu_percent','memory_percent']), key=lambda p: p.info.get('cpu_percent',0), reverse=True)
-        for p in procs[:10]:
+        # partial selection of the top 10 instead of sorting every process
+        procs = heapq.nlargest(10, psutil.process_iter(['pid','name','cpu_percent','memory_percent']),
+                               key=lambda p: p.info.get('cpu_percent') or 0.0)
+        for p in procs:
             info = p.info
             safe_print(f"{info.get('pid'):>6} {info.get('cpu_percent',0):>5}% {info.get('memory_percent',0):>5.2f}% {info.get('name')}")
 
@@ -696,7 +1051,7 @@ class Terminal:
     # ---- Utilities ----
     def do_help(self, argv):
         safe_print("Built-in commands:")
-        names = sorted(self.builtins.keys())
+        names = self._cmd_names
         safe_print("  " + ", ".join(names))
         safe_print("\nExternal commands are forwarded to the system shell.")
         safe_print("Type 'exit' or 'quit' to leave.")
@@ -720,7 +1075,7 @@ class Terminal:
         """
         t = text.strip().lower()
         # create/mkdir
-        m = re.search(r'(create|make|new)\s+(?:a\s+)?(?:folder|directory)\s+(?:called\s+)?["\']?([^\s"\']+)["\']?', t)
+        m = _NL_MKDIR_RE.search(t)
         if m:
             name = m.group(2)
 
@@ -1,9 +1,39 @@
 
-import os, sys, shutil, psutil, readline, shlex, re, subprocess
+import os, sys, re, shutil, psutil, readline, shlex, subprocess, bisect, functools, time, stat, threading
 from datetime import datetime
 
 HISTORY_FILE = os.path.expanduser("~/.pyterminal_history")
 MAX_HISTORY = 2000
+PS_CACHE_TTL = 1.0  # seconds a ps listing is reused
+CPU_SAMPLE_INTERVAL = 1.0  # seconds per background cpu_percent sample
+MEM_CACHE_TTL = 0.5  # seconds a virtual_memory() reading is reused
+# libedit history files start with this line and vis-encode each entry (\040 for a space)
+LIBEDIT_HEADER = b"_HiStOrY_V2_"
+_VIS_ESCAPE_RE = re.compile(rb"\\(?:([0-7]{3})|(.))", re.S)
+
+HELP_TEXT = ("Supported commands:\n"
+             "  ls [dir]         - List directory contents\n"
+             "  cd <dir>         - Change directory\n"
+             "  pwd              - Print working directory\n"
+             "  mkdir <dir>      - Make directory\n"
+             "  rm <target>      - Remove file or directory\n"
+             "  cpu              - Show CPU usage\n"
+             "  mem              - Show memory usage\n"
+             "  ps               - List processes\n"
+             "  history          - Show command history\n"
+             "  help             - Show this help\n"
+             "  exit             - Exit terminal\n"
+             "Optional: AI-driven natural language (type: ai <query>)\n")
+AI_TEXT = "AI-driven command interpretation is not implemented yet."
+
+# (time.monotonic() when built, output) of the last ps listing, shared by all instances
+_ps_cache = (float("-inf"), "")
+# latest CPU percentage from the sampler thread (None until the first sample)
+_cpu_pct = None
+_cpu_sampler = None
+_cpu_sampler_lock = threading.Lock()
+# (time.monotonic() when read, psutil.virtual_memory() result)
+_mem_cache = (float("-inf"), None)
 
 def safe_print(s=""):
     if isinstance(s, bytes):
@@ -13,18 +43,60 @@ def safe_print(s=""):
             s = str(s)
     print(s)
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
 def human_size(n):
-    for unit in ['B','KB','MB','GB','TB']:
-        if abs(n) < 1024.0:
-            return f"{n:3.1f}{unit}"
-        n /= 1024.0
-    return f"{n:.1f}PB"
+    # each unit is 2**10 of the previous one, so bit_length picks it without a loop
+    idx = min(max(0, (int(abs(n)).bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+    return f"{n / (1 << (idx * 10)):3.1f}{SIZE_UNITS[idx]}"
+
+def tail_lines(fh, n, block=4096):
+    # last n lines of an open binary file, read backwards from the end
+    if n <= 0:
+        return []
+    pos = os.fstat(fh.fileno()).st_size
+    chunks = []
+    newlines = 0
+    while pos > 0 and newlines <= n:
+        step = min(block, pos)
+        pos -= step
+        fh.seek(pos)
+        chunk = fh.read(step)
+        newlines += chunk.count(b"\n")
+        chunks.append(chunk)
+    return b"".join(reversed(chunks)).splitlines()[-n:]
+
+def unvis(line):
+    # undo libedit's vis encoding: \ooo octal escapes, backslash before anything else
+    return _VIS_ESCAPE_RE.sub(lambda m: bytes([int(m[1], 8)]) if m[1] else m[2], line)
+
+def tail_history():
+    # newest MAX_HISTORY entries of the history file, decoded; understands the libedit format
+    with open(HISTORY_FILE, 'rb') as fh:
+        libedit = fh.readline().rstrip(b"\n") == LIBEDIT_HEADER
+        lines = tail_lines(fh, MAX_HISTORY + libedit)
+    if libedit:
+        if lines and lines[0] == LIBEDIT_HEADER:
+            del lines[0]
+        lines = map(unvis, lines[-MAX_HISTORY:])
+    return [l.decode("utf-8", errors="replace") for l in lines]
 
 def read_history():
+    # libedit writes its own format (_HiStOrY_V2_ header, \040 for spaces); let it parse it
+    if "libedit" in (readline.__doc__ or ""):
+        try:
+            readline.read_history_file(HISTORY_FILE)
+        except OSError:
+            pass
+        return
+    # only the newest MAX_HISTORY entries, however large the file has grown
     try:
-        readline.read_history_file(HISTORY_FILE)
+        lines = tail_history()
     except FileNotFoundError:
-        pass
+        return
+    readline.clear_history()
+    for line in lines:
+        readline.add_history(line)
 
 def write_history():
     try:
@@ -33,34 +105,112 @@ def write_history():
     except Exception:
         pass
 
+def split_args(line):
+    # shlex only when there is quoting or escaping to undo; str.split otherwise
+    if '"' in line or "'" in line or '\\' in line:
+        return shlex.split(line)
+    return line.split()
+
+def prefix_matches(names, prefix):
+    # names must be sorted: bisect to the first candidate, walk while it matches
+    i = bisect.bisect_left(names, prefix)
+    out = []
+    while i < len(names) and names[i].startswith(prefix):
+        out.append(names[i])
+        i += 1
+    return out
+
+@functools.lru_cache(maxsize=128)
+def scandir_sorted(path, mtime_ns):
+    # mtime_ns is only part of the key, so a changed directory is re-read.
+    # Returns (sorted names, names that are directories); is_dir() comes from
+    # the dirent type, so only symlinks cost an extra stat.
+    with os.scandir(path) as it:
+        entries = [(e.name, e.is_dir()) for e in it]
+    return tuple(sorted(name for name, _ in entries)), frozenset(name for name, is_dir in entries if is_dir)
+
+def _sample_cpu():
+    global _cpu_pct
+    while True:
+        _cpu_pct = psutil.cpu_percent(interval=CPU_SAMPLE_INTERVAL)
+
+def start_cpu_sampler():
+    # one daemon thread per process, however many Terminals are created.
+    # Its first reading takes CPU_SAMPLE_INTERVAL, so seed _cpu_pct with a short
+    # blocking sample (a non-blocking cpu_percent() with no prior call reads 0.0);
+    # concurrent first callers wait on the lock for it instead of sampling too.
+    global _cpu_sampler, _cpu_pct
+    if _cpu_sampler is not None:
+        return
+    with _cpu_sampler_lock:
+        if _cpu_sampler is None:
+            _cpu_pct = psutil.cpu_percent(interval=0.1)
+            _cpu_sampler = threading.Thread(target=_sample_cpu, name="cpu-sampler", daemon=True)
+            _cpu_sampler.start()
+
+def check_dir(path):
+    # raise what os.chdir(path) would, without touching the process-wide cwd
+    os.stat(path)
+    if not os.path.isdir(path):
+        raise NotADirectoryError(path)
+    if not os.access(path, os.X_OK):
+        raise PermissionError(path)
+
+def builtin_names(cls):
+    # sorted command names from the do_* methods, computed once per class
+    return tuple(sorted(name[3:] for name in dir(cls) if name.startswith("do_")))
+
 class Terminal:
-    def __init__(self):
-        self.cwd = os.path.abspath(os.getcwd())
+    # web.py builds one instance per request; no per-instance __dict__
+    __slots__ = ('interactive', 'cwd', '_home', 'builtins', '_last_completion')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._BUILTIN_NAMES = builtin_names(cls)
+
+    def __init__(self, interactive=None, cwd=None):
+        if interactive is None:
+            interactive = sys.stdin.isatty()
+        self.interactive = interactive
+        # non-interactive instances keep their own cwd and never chdir the process,
+        # so several can serve requests side by side
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self._home = os.path.expanduser('~')
         self.builtins = self._discover_builtins()
-        self.setup_readline()
+        # (text, offerings) from the last completer call with state == 0
+        self._last_completion = (None, [])
+        # history and completion only matter at a real prompt
+        if interactive:
+            self.setup_readline()
 
     def _discover_builtins(self):
-        cmds = {}
-        for name in dir(self):
-            if name.startswith("do_"):
-                cmd = name[3:]
-                cmds[cmd] = getattr(self, name)
-        return cmds
+        return {cmd: getattr(self, "do_" + cmd) for cmd in self._BUILTIN_NAMES}
+
+    def _resolve(self, p):
+        # expanduser + absolute against self.cwd; $HOME was looked up once in __init__
+        if p[:1] == '~':
+            p = self._home + p[1:] if p[1:2] in ('', os.sep) else os.path.expanduser(p)
+        return p if os.path.isabs(p) else os.path.join(self.cwd, p)
 
     def setup_readline(self):
         readline.parse_and_bind('tab: complete')
         read_history()
         def completer(text, state):
+            # readline asks for state 0, 1, 2, ... of the same text; compute once
+            if state > 0 and self._last_completion[0] == text:
+                offerings = self._last_completion[1]
+                return offerings[state] if state < len(offerings) else None
             buffer = readline.get_line_buffer()
-            line = shlex.split(buffer) if buffer.strip() else []
+            line = split_args(buffer)
             if len(line) == 0 or (buffer.endswith(" ") and len(line) >= 1):
                 offerings = self._complete_path(text)
             else:
                 first_token = line[0]
                 if buffer.startswith(first_token) and buffer.strip() == first_token:
-                    offerings = [c for c in list(self.builtins.keys()) + self._complete_path(text) if c.startswith(text)]
+                    offerings = prefix_matches(self._BUILTIN_NAMES, text) + [p for p in self._complete_path(text) if p.startswith(text)]
                 else:
                     offerings = self._complete_path(text)
+            self._last_completion = (text, offerings)
             try:
                 return offerings[state]
             except Exception:
@@ -74,34 +224,42 @@ class Terminal:
         dirname = os.path.dirname(text_exp) or '.'
         basename = os.path.basename(text_exp)
         try:
-            entries = os.listdir(dirname)
+            absdir = os.path.abspath(dirname)
+            names, dirs = scandir_sorted(absdir, os.stat(absdir).st_mtime_ns)
         except Exception:
-            entries = []
-        results = [os.path.join(dirname, e) for e in entries if e.startswith(basename)]
+            names, dirs = (), frozenset()
         out = []
-        for r in results:
-            display = r
+        for name in prefix_matches(names, basename):
+            display = os.path.join(dirname, name)
             if text.startswith('~'):
-                home = os.path.expanduser('~')
-                if r.startswith(home):
-                    display = '~' + r[len(home):]
-            if os.path.isdir(r):
+                home = self._home
+                if display.startswith(home):
+                    display = '~' + display[len(home):]
+            if name in dirs:
                 display += os.sep
             out.append(display)
         return out
 
     def execute_line(self, line):
-        try:
-            tokens = shlex.split(line)
-        except ValueError as e:
-            return f"parse error: {e}"
-        if not tokens:
-            return ""
-        cmd = tokens[0]
-        args = tokens[1:]
-        if cmd in self.builtins:
+        # a bare builtin name (pwd, cpu, mem, help, ...) needs no tokenizing:
+        # builtin names contain no spaces, quotes or backslashes
+        cmd = line.strip()
+        func = self.builtins.get(cmd)
+        if func is not None:
+            args = []
+        else:
             try:
-                result = self.builtins[cmd](args)
+                tokens = split_args(line)
+            except ValueError as e:
+                return f"parse error: {e}"
+            if not tokens:
+                return ""
+            cmd = tokens[0]
+            args = tokens[1:]
+            func = self.builtins.get(cmd)
+        if func is not None:
+            try:
+                result = func(args)
                 return result if result is not None else ""
             except Exception as e:
                 return f"error executing builtin {cmd}: {e}"
@@ -112,14 +270,9 @@ class Terminal:
     def run_external(self, cmd, args):
         full_cmd = [cmd] + args
         try:
-            proc = subprocess.Popen(full_cmd, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            out, err = proc.communicate()
-            output = ""
-            if out:
-                output += out.decode(errors='replace')
-            if err:
-                output += err.decode(errors='replace')
-            return output
+            # stderr merged into stdout: one pipe, one buffer, one utf-8 decode at the end
+            proc = subprocess.run(full_cmd, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            return proc.stdout.decode('utf-8', errors='replace')
         except FileNotFoundError:
             return f"{cmd}: command not found"
         except Exception as e:
@@ -129,13 +282,13 @@ class Terminal:
         return self.cwd
 
     def do_cd(self, argv):
-        target = argv[0] if argv else os.path.expanduser('~')
-        target = os.path.expanduser(target)
-        if not os.path.isabs(target):
-            target = os.path.join(self.cwd, target)
+        target = self._resolve(argv[0] if argv else '~')
         try:
             target = os.path.abspath(target)
-            os.chdir(target)
+            if self.interactive:
+                os.chdir(target)
+            else:
+                check_dir(target)
             self.cwd = target
             return ""
         except FileNotFoundError:
@@ -148,38 +301,32 @@ class Terminal:
             return f"cd: {e}"
 
     def do_ls(self, argv):
-        path = argv[0] if argv else "."
-        long = False
-        show_all = False
-        flags = [a for a in argv if a.startswith('-')]
-        for f in flags:
-            if 'l' in f:
-                long = True
-            if 'a' in f:
-                show_all = True
-        if argv and not argv[0].startswith('-'):
-            path = argv[0]
-        path = os.path.expanduser(path)
-        if not os.path.isabs(path):
-            path = os.path.join(self.cwd, path)
+        long = show_all = False
+        path = None
+        # one pass: flags anywhere, first operand is the path
+        for a in argv:
+            if a.startswith('-'):
+                long |= 'l' in a
+                show_all |= 'a' in a
+            elif path is None:
+                path = a
+        path = self._resolve(path or ".")
         try:
             if os.path.isdir(path):
-                entries = os.listdir(path)
-                if not show_all:
-                    entries = [e for e in entries if not e.startswith('.')]
-                entries.sort()
+                with os.scandir(path) as it:
+                    entries = sorted((e for e in it if show_all or not e.name.startswith('.')), key=lambda e: e.name)
                 if long:
                     lines = []
                     for e in entries:
-                        full = os.path.join(path, e)
-                        stat = os.stat(full)
-                        mtime = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                        perms = oct(stat.st_mode)[-3:]
-                        size = human_size(stat.st_size)
-                        lines.append(f"{perms}\t{size:>7}\t{mtime}\t{e}")
+                        # DirEntry caches its stat; no path join per entry
+                        st = e.stat(follow_symlinks=False)
+                        mtime = datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M')
+                        perms = oct(st.st_mode)[-3:]
+                        size = human_size(st.st_size)
+                        lines.append(f"{perms}\t{size:>7}\t{mtime}\t{e.name}")
                     return "\n".join(lines)
                 else:
-                    return "  ".join(entries)
+                    return "  ".join(e.name for e in entries)
             else:
                 return os.path.basename(path)
         except FileNotFoundError:
@@ -192,90 +339,106 @@ class Terminal:
     def do_mkdir(self, argv):
         if not argv:
             return "mkdir: missing operand"
-        for d in argv:
-            target = os.path.expanduser(d)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
+        # resolve everything up front, then try every target and report all failures
+        resolved = [(d, self._resolve(d)) for d in argv]
+        errors = []
+        for d, target in resolved:
             try:
-                os.makedirs(target, exist_ok=False)
+                try:
+                    os.mkdir(target)
+                except FileNotFoundError:
+                    # missing parents: only then pay for the makedirs walk
+                    os.makedirs(target, exist_ok=False)
             except FileExistsError:
-                return f"mkdir: cannot create directory '{d}': File exists"
+                errors.append(f"mkdir: cannot create directory '{d}': File exists")
             except PermissionError:
-                return f"mkdir: cannot create directory '{d}': Permission denied"
+                errors.append(f"mkdir: cannot create directory '{d}': Permission denied")
             except Exception as e:
-                return f"mkdir: {e}"
-        return ""
+                errors.append(f"mkdir: {e}")
+        return "\n".join(errors)
 
     def do_rm(self, argv):
         if not argv:
             return "rm: missing operand"
-        recursive = False
-        force = False
+        recursive = force = False
         targets = []
         for a in argv:
             if a.startswith('-'):
-                if 'r' in a:
-                    recursive = True
-                if 'f' in a:
-                    force = True
+                recursive |= 'r' in a
+                force |= 'f' in a
             else:
                 targets.append(a)
-        for t in targets:
-            target = os.path.expanduser(t)
-            if not os.path.isabs(target):
-                target = os.path.join(self.cwd, target)
-            if os.path.isdir(target) and not os.path.islink(target):
+        resolved = [(t, self._resolve(t)) for t in targets]
+        errors = []
+        for t, target in resolved:
+            try:
+                # one lstat answers both "directory?" and "symlink?"
+                is_dir = stat.S_ISDIR(os.lstat(target).st_mode)
+            except OSError:
+                is_dir = False
+            if is_dir:
                 if not recursive:
-                    return f"rm: cannot remove '{t}': Is a directory (use -r)"
+                    errors.append(f"rm: cannot remove '{t}': Is a directory (use -r)")
+                    continue
                 try:
                     shutil.rmtree(target)
                 except Exception as e:
-                    return f"rm: failed to remove directory '{t}': {e}"
+                    errors.append(f"rm: failed to remove directory '{t}': {e}")
             else:
                 try:
                     os.remove(target)
                 except FileNotFoundError:
                     if not force:
-                        return f"rm: cannot remove '{t}': No such file or directory"
+                        errors.append(f"rm: cannot remove '{t}': No such file or directory")
                 except PermissionError:
-                    return f"rm: cannot remove '{t}': Permission denied"
+                    errors.append(f"rm: cannot remove '{t}': Permission denied")
                 except Exception as e:
-                    return f"rm: {e}"
-        return ""
+                    errors.append(f"rm: {e}")
+        return "\n".join(errors)
 
     def do_cpu(self, argv):
-        return f"CPU Usage: {psutil.cpu_percent()}%"
+        # the sampler thread does the 1 s measurement; the first call starts it
+        # and blocks ~0.1 s for a seed value, later calls never block
+        if _cpu_pct is None:
+            start_cpu_sampler()
+        return f"CPU Usage: {_cpu_pct}%"
 
     def do_mem(self, argv):
-        mem = psutil.virtual_memory()
+        global _mem_cache
+        now = time.monotonic()
+        read_at, mem = _mem_cache
+        if mem is None or now - read_at >= MEM_CACHE_TTL:
+            mem = psutil.virtual_memory()
+            _mem_cache = (now, mem)
         return f"Memory Usage: {mem.percent}% ({mem.used // (1024**2)}MB/{mem.total // (1024**2)}MB)"
 
     def do_ps(self, argv):
-        lines = []
-        for proc in psutil.process_iter(['pid', 'name']):
-            lines.append(f"PID: {proc.info['pid']}, Name: {proc.info['name']}")
-        return "\n".join(lines)
+        # walking /proc for every pid is costly; repeated calls within the TTL share one walk
+        global _ps_cache
+        now = time.monotonic()
+        built, output = _ps_cache
+        if now - built < PS_CACHE_TTL:
+            return output
+        output = "\n".join(f"PID: {p.info['pid']}, Name: {p.info['name']}"
+                           for p in psutil.process_iter(['pid', 'name']))
+        _ps_cache = (now, output)
+        return output
 
     def do_help(self, argv):
-        return ("Supported commands:\n"
-                "  ls [dir]         - List directory contents\n"
-                "  cd <dir>         - Change directory\n"
-                "  pwd              - Print working directory\n"
-                "  mkdir <dir>      - Make directory\n"
-                "  rm <target>      - Remove file or directory\n"
-                "  cpu              - Show CPU usage\n"
-                "  mem              - Show memory usage\n"
-                "  ps               - List processes\n"
-                "  history          - Show command history\n"
-                "  help             - Show this help\n"
-                "  exit             - Exit terminal\n"
-                "Optional: AI-driven natural language (type: ai <query>)\n")
+        return HELP_TEXT
 
     def do_history(self, argv):
-        lines = []
-        for i in range(readline.get_current_history_length()):
-            lines.append(readline.get_history_item(i+1))
-        return "\n".join(lines)
+        if not self.interactive:
+            # readline was never set up; show the persisted history instead
+            try:
+                return "\n".join(tail_history())
+            except OSError:
+                return ""
+        n = readline.get_current_history_length()
+        # map/filter keep the per-item loop in C; filter drops None for missing slots
+        return "\n".join(filter(None, map(readline.get_history_item, range(1, n + 1))))
 
     def do_ai(self, argv):
-        return "AI-driven command interpretation is not implemented yet."
+        return AI_TEXT
+
+Terminal._BUILTIN_NAMES = builtin_names(Terminal)
@@ -1,23 +1,34 @@
 # Flask-based web UI for the terminal
+import os
+from functools import lru_cache
 from flask import Flask, request, render_template, jsonify
 from core.terminal import Terminal
 from core.ai import interpret_natural_language
 
 app = Flask(__name__)
-terminal = Terminal()
+START_DIR = os.getcwd()
+
+# the interpreter may be slow (remote model); repeated phrasings hit the cache
+interpret = lru_cache(maxsize=1024)(interpret_natural_language)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
     output = ""
+    # One cheap Terminal per request; the page carries the cwd between requests,
+    # so workers share no mutable state.
+    cwd = request.form.get('cwd') or START_DIR
+    terminal = Terminal(interactive=False, cwd=cwd if os.path.isdir(cwd) else START_DIR)
     if request.method == 'POST':
         cmd = request.form.get('command', '')
-        # AI interpretation
-        if cmd and not cmd.split()[0] in terminal.builtins:
-            ai_cmd = interpret_natural_language(cmd)
+        # AI interpretation; nothing to interpret without any letters
+        stripped = cmd.strip()
+        if (any(c.isalpha() for c in stripped)
+                and stripped.partition(' ')[0] not in terminal.builtins):
+            ai_cmd = interpret(stripped)
             if ai_cmd:
                 cmd = ai_cmd
         output = terminal.execute_line(cmd)
-    return render_template('index.html', output=output)
+    return render_template('index.html', output=output, cwd=terminal.cwd)
 
 if __name__ == '__main__':
     app.run(debug=True)